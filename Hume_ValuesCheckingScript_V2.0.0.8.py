@@ -8,11 +8,46 @@ Version: 2.0.0.8 (Refactored)
 """
 
 import os
+import re
+import time
+import sys
+import io
+import csv
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import arcpy
 from datetime import datetime
 from typing import List, Tuple, Any
+from collections import defaultdict, Counter
 import gc
 
+try:
+    from rtree import index as rtree_index  # optional, speeds up per-feature checks
+except ImportError:
+    rtree_index = None
+
+try:
+    from shapely import wkb as shapely_wkb  # optional, prepared geometry for measure checks
+    from shapely.prepared import prep as shapely_prep
+except ImportError:
+    shapely_wkb = None
+
+try:
+    from shapely import STRtree as shapely_strtree, from_wkb as shapely_from_wkb  # shapely 2.0+, bulk spatial index
+except ImportError:
+    shapely_strtree = None
+
+def get_worker_count(default: int = 1) -> int:
+    """Read VALUESCHECK_WORKERS, falling back to the default (with a warning) if it isn't a whole number."""
+    value = os.environ.get("VALUESCHECK_WORKERS", "")
+    if not value.strip():
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        arcpy.AddWarning(f"Ignoring VALUESCHECK_WORKERS={value!r}, not a whole number - using {default} worker(s)")
+        return default
+
 #####################################################################################
 #           ADJUST THESE IF RUNNING OUTSIDE OF THE ARCGIS PRO TOOLBOX               #
 #####################################################################################
@@ -23,28 +58,86 @@ FEATURE_ID      = 'DAP_REF_NO'                                  # Feature ID Fie
 THEME_REFTAB    = 'C:\\data\\daptest\\Single Report Tool\\Reference Tables\\reftables.gdb\\REFTABLE_DAP_20250417'  # Theme Reference Table
 GISPUB_LOCATION = 'C:\\data'                                    # Local gis_public folder location
 OUT_PATH        = 'C:\\data\\20250709_hume_test'                # Output Path
+WORKERS         = get_worker_count()                            # Processes for per-feature checks (1 = no parallelism)
 
 ######################################################################################
 ######################################################################################
 
+# Common words abbreviated by ValuesCheckTool.shorten_text
+ABBREVIATIONS = {
+    'Landscape': 'Lndscp', 'Highway': 'Hwy', 'Road': 'Rd',
+    'Designated': 'Dsgntd', 'Catchment': 'Ctchmnt', 'Woodland': 'Wdlnd',
+    'Drive': 'Dr', 'Mosaic': 'Msc', 'Complex': 'Cmplx',
+    'Eucalyptus': 'Eu.', 'Shrubland': 'Shrbl', 'Herbland': 'Hrbl',
+    'Forest': 'Fst', 'Point': 'Pt', 'protection': 'prtn',
+    'Creek': 'Ck', 'Township': 'Tshp', 'habitat': 'hab',
+    'settlement': 'stlmnt', 'Reserve': 'Rsv', ' and ': ' & ',
+    'Alpine': 'Alp', 'alpine': 'alp', 'Goulburn': 'Glbn',
+    'River': 'Riv', ',': ';', "'": ''
+}
+
+# Single-pass pattern for all abbreviations, longest first so longer words win
+ABBREVIATIONS_RE = re.compile("|".join(sorted(map(re.escape, ABBREVIATIONS), key=len, reverse=True)))
+
 class ValuesCheckTool:
     """Main class for performing spatial values checking operations."""
+
+    # Reference table fields read for each theme
+    THEME_FIELDS = [
+        "CHECK_YN", "DEFAULTWS_YN", "DATA_LOC", "GDB_NAME", "FC_NAME",
+        "DEF_QUERY", "CHECK_METHOD", "REPFLD1", "REPFLD2", "REPFLD3", 
+        "REPFLD4", "BUFFER_DIST"
+    ]
+
+    # Largest values layer held in memory with a spatial index for per-feature checks
+    INDEX_MAX_FEATURES = 50000
+
+    # Features processed between progressor updates
+    PROGRESS_STEP = 32
+
+    # Maximum number of feature IDs in one SQL IN clause
+    ID_BATCH_SIZE = 200
+
+    # Divisor, decimal places and unit suffix for measured geometry types
+    MEASURE_UNITS = {"POLYGON": (10000, 1, "ha"), "POLYLINE": (1000, 3, "km")}
+
+    # Removes CSV-breaking characters from attribute values in a single pass
+    # (double quotes are escaped after trimming, see quote_formula)
+    CLEAN_TABLE = str.maketrans({"'": None, ",": ";", "\n": "_n"})
     
     def __init__(self, input_fc: str, id_field: str, ref_table: str, 
-                 csdl_location: str, output_path: str):
-        """Initialize the tool with parameters."""
+                 csdl_location: str, output_path: str, log_name: str = "script_performance",
+                 describe_cache: dict = None):
+        """Initialize the tool with parameters; describe_cache seeds Describe results already read."""
         self.input_fc = input_fc
         self.buffer_cache = {}  # Changed to dict for O(1) lookup
-        self.values_cache = {}  # Changed to dict for O(1) lookup
+        self.values_cache = {}  # Values layers keyed by (theme path, definition query)
+        self.theme_layers = []  # Values layer for each row of theme_rows
+        self.theme_checks = []  # (check function, format function, reporting fields) for each row of theme_rows
         self.layer_selections = {}  # Track layer selections for cleanup
+        self.describe_cache = dict(describe_cache or {})  # Describe results keyed by dataset
+        self.converter_cache = {}  # Per-field value converters keyed by (dataset, fields)
+        self.theme_indexes = {}  # Spatial index and row store keyed by (values layer, fields); None = not indexed
+        self.prepared_geom = (None, None, None)  # (arcpy geometry, shapely geometry, prepared geometry) last measured against
+        self.theme_rows = []  # Reference table rows with CHECK_YN = "Y"
+        self.theme_names = []  # THEMENAME for each row of theme_rows
+        self.id_field_type = None  # Field type of the ID field, read once
+        self.feature_geoms = {}  # Feature geometries keyed by buffer cache name, then feature ID
+        self.theme_results = {}  # Batch results keyed by theme index; None = check per feature
+        self.dissolved_works = {}  # Works layers dissolved by ID for batch measures, keyed by works layer
+        self.memory_datasets = set()  # memory workspace feature classes created by this tool, deleted in _cleanup
         self.id_field = id_field
         self.ref_table = ref_table
         self.csdl_location = csdl_location
         self.output_path = output_path
         self.temp_gdb = None
         self.counter = 0
-        perf_log_path = os.path.join(self.output_path, f"{self.get_timestamp()}_script_performance.txt")
-        self.perf_log = open(perf_log_path, "w")
+        self.input_basename = self.get_basename(input_fc)  # name used for buffer cache keys and output
+        self.timestamp = self.get_timestamp()  # shared by the log and CSV names
+        self.perf_log_path = os.path.join(self.output_path, f"{self.timestamp}_{log_name}.txt")
+        self.perf_log = None  # opened on first message, see logMessage
+        self.log_time = (0, "")  # (whole second, formatted time) of the last log line
+        self.echo_messages = True  # also send messages to the geoprocessing window
         
         # Setup environment
         self._setup_environment()
@@ -59,13 +152,14 @@ class ValuesCheckTool:
         sr = arcpy.SpatialReference(7899) # Set spatial reference to VICGRID2020
         arcpy.env.outputCoordinateSystem = sr
         arcpy.env.cartographicCoordinateSystem = sr
+        self.spatial_ref = sr  # geometries read for in-memory checks are projected to this
 
         # Disable spatial indexing during processing for better performance
         arcpy.env.autoCommit = 1000  # Commit every 1000 operations
         
         # Create output directory and temp workspace
         os.makedirs(self.output_path, exist_ok=True)
-        arcpy.env.workspace = r"in_memory"
+        arcpy.env.workspace = r"memory"
     
     @staticmethod
     def get_timestamp() -> str:
@@ -80,32 +174,63 @@ class ValuesCheckTool:
     @staticmethod
     def shorten_text(text: str) -> str:
         """Abbreviate common words to reduce text length."""
-        abbreviations = {
-            'Landscape': 'Lndscp', 'Highway': 'Hwy', 'Road': 'Rd',
-            'Designated': 'Dsgntd', 'Catchment': 'Ctchmnt', 'Woodland': 'Wdlnd',
-            'Drive': 'Dr', 'Mosaic': 'Msc', 'Complex': 'Cmplx',
-            'Eucalyptus': 'Eu.', 'Shrubland': 'Shrbl', 'Herbland': 'Hrbl',
-            'Forest': 'Fst', 'Point': 'Pt', 'protection': 'prtn',
-            'Creek': 'Ck', 'Township': 'Tshp', 'habitat': 'hab',
-            'settlement': 'stlmnt', 'Reserve': 'Rsv', ' and ': ' & ',
-            'Alpine': 'Alp', 'alpine': 'alp', 'Goulburn': 'Glbn',
-            'River': 'Riv', ',': ';', "'": ''
-        }
-        
-        for full_word, abbr in abbreviations.items():
-            text = text.replace(full_word, abbr)
-        
-        return text
+        return ABBREVIATIONS_RE.sub(lambda match: ABBREVIATIONS[match.group(0)], text)
     
     @staticmethod
-    def get_reporting_fields(self, field_list: List[str]) -> List[str]:
+    def get_reporting_fields(field_list: List[str]) -> List[str]:
         """Filter out empty or null reporting fields."""
         return [field for field in field_list if field and field.strip()]
     
+    @staticmethod
+    def quote_formula(text: str) -> str:
+        """Double any double quotes so a finished (already trimmed) string survives inside ="..." formulas."""
+        return str(text).replace('"', '""')
+    
+    @staticmethod
+    def format_text(val: Any) -> str:
+        """Convert a non-date attribute value to a CSV-safe string."""
+        return str(val).translate(ValuesCheckTool.CLEAN_TABLE)
+    
+    @staticmethod
+    def format_date(val: Any) -> str:
+        """Convert a date attribute value to a simplified date string."""
+        return val.strftime('%Y-%m-%d') if val is not None else "None"
+    
+    def get_converters(self, dataset: str, fields: List[str]) -> List[callable]:
+        """Return one value converter per field, chosen once from the dataset's field types."""
+        key = (dataset, tuple(fields))
+        if key not in self.converter_cache:
+            field_types = {field.name.upper(): field.type for field in self.get_describe(dataset).fields}
+            self.converter_cache[key] = [
+                self.format_date if field_types.get(field.upper()) == "Date" else self.format_text
+                for field in fields
+            ]
+        return self.converter_cache[key]
+    
+    @staticmethod
+    def _clean_row(row: Tuple[Any, ...], converters: List[callable]) -> Tuple[str, ...]:
+        """Convert a cursor row to a tuple of CSV-safe strings, dropping nulls."""
+        return tuple(convert(val) for convert, val in zip(converters, row) if val is not None)
+    
+    def get_theme_path(self, default_ws: str, location: str, gdb_name: str, fc_name: str) -> str:
+        """Resolve the data path for a theme from its reference table fields."""
+        if default_ws.upper() == "Y":
+            return os.path.join(self.csdl_location, location, gdb_name, fc_name)
+        return location  # DATA_LOC
+    
+    def get_describe(self, dataset: str) -> Any:
+        """Return the Describe object for a dataset, caching it for re-use."""
+        if dataset not in self.describe_cache:
+            self.describe_cache[dataset] = arcpy.Describe(dataset)
+        return self.describe_cache[dataset]
+    
     def cache_buffers(self, feature_class: str, buffer_distances: list) -> None:
-        """Create buffers around all feature classes for later re-use"""
+        """
+        Create buffers around all feature classes for later re-use.
+        Each distance is buffered once for all features and shared by every theme using it.
+        """
         
-        desc = arcpy.Describe(feature_class)
+        desc = self.get_describe(feature_class)
 
         # Copy base features (unbuffered) unless it already exists in cache
         name = desc.baseName
@@ -127,27 +252,135 @@ class ValuesCheckTool:
                 else:
                     side = "FULL"
 
-                # Use in_memory workspace for buffers with unique naming
+                # Use memory workspace for buffers with unique naming
                 unique_suffix = id(self)
-                buffer_fc = f"in_memory\\{buffer_name}_{unique_suffix}"
+                buffer_fc = f"memory\\{buffer_name}_{unique_suffix}"
+                self.memory_datasets.add(buffer_fc)
                 layer_name = f"{buffer_name}_layer_{unique_suffix}"
                 
-                arcpy.analysis.Buffer(
-                        in_features=feature_class,
-                        out_feature_class=buffer_fc,
-                        buffer_distance_or_field=f"{distance} meters",
-                        line_side=side,
-                        line_end_type="ROUND",
-                        dissolve_option="NONE",
-                        dissolve_field=None,
-                        method="PLANAR"
-                    )
+                if side == "FULL":
+                    # Pairwise buffer runs in parallel; it has no OUTSIDE_ONLY option
+                    arcpy.analysis.PairwiseBuffer(
+                            in_features=feature_class,
+                            out_feature_class=buffer_fc,
+                            buffer_distance_or_field=f"{distance} meters",
+                            dissolve_option="NONE",
+                            method="PLANAR"
+                        )
+                else:
+                    arcpy.analysis.Buffer(
+                            in_features=feature_class,
+                            out_feature_class=buffer_fc,
+                            buffer_distance_or_field=f"{distance} meters",
+                            line_side=side,
+                            line_end_type="ROUND",
+                            dissolve_option="NONE",
+                            dissolve_field=None,
+                            method="PLANAR"
+                        )
 
                 # Create layer from buffer
                 arcpy.management.MakeFeatureLayer(buffer_fc, layer_name)
                 self.buffer_cache[buffer_name] = layer_name
                 self.layer_selections[layer_name] = None
     
+    def ensure_spatial_indexes(self) -> None:
+        """Add a spatial index to any cached values dataset that does not have one."""
+        for theme_path in {path for path, query in self.values_cache}:
+            try:
+                if not self.get_describe(theme_path).hasSpatialIndex:
+                    arcpy.management.AddSpatialIndex(theme_path)
+                    self.logMessage('info', f"Added spatial index to {theme_path}")
+            except Exception as e:
+                # Read-only sources (e.g. network gis_public) are used without an index
+                self.logMessage('warn', f"Could not add spatial index to {theme_path}: {str(e)}")
+    
+    def build_id_where_clause(self, feature_names: List[Any]) -> str:
+        """Build an SQL IN clause selecting the given feature IDs."""
+        field = arcpy.AddFieldDelimiters(self.input_fc, self.id_field)
+        if self._get_field_type().upper() == "STRING":
+            values = ",".join("'" + str(name).replace("'", "''") + "'" for name in feature_names)
+        else:
+            values = ",".join(str(name) for name in feature_names)
+        return f"{field} IN ({values})"
+    
+    def cache_feature_geometries(self, feature_names: List[Any] = None) -> None:
+        """
+        Read the geometry of every cached works layer once, keyed by feature ID.
+        If feature_names is given, only those features are read, in IN-clause batches.
+        """
+        if feature_names is None:
+            where_clauses = [None]
+        else:
+            where_clauses = [
+                self.build_id_where_clause(feature_names[i:i + self.ID_BATCH_SIZE])
+                for i in range(0, len(feature_names), self.ID_BATCH_SIZE)
+            ]
+        
+        for name, layer_name in self.buffer_cache.items():
+            geoms = {}
+            for where_clause in where_clauses:
+                with arcpy.da.SearchCursor(layer_name, [self.id_field, "SHAPE@"], where_clause, 
+                                           spatial_reference=self.spatial_ref) as cursor:
+                    for feature_id, geom in cursor:
+                        if geom is None:
+                            self.logMessage('warn', f"Skipping a null geometry for feature {feature_id} in {name}")
+                            continue
+                        # Features sharing an ID are treated as one, as the old selection did
+                        geoms[feature_id] = geom.union(geoms[feature_id]) if feature_id in geoms else geom
+            self.feature_geoms[name] = geoms
+    
+    def cache_theme_extracts(self) -> None:
+        """
+        Copy the values features near the works into memory for themes checked one
+        feature at a time, so their repeated selections read from RAM instead of disk.
+        """
+        feature_class = self.input_basename
+        largest_buffer = max((row[-1] or 0 for row in self.theme_rows), default=0)
+        works_layers = [self.buffer_cache[feature_class]]
+        if largest_buffer > 0:
+            works_layers.append(self.buffer_cache[f"{feature_class}_{largest_buffer}"])
+        
+        extracts = {}  # source layer -> memory layer (None if nothing is near the works), shared by themes
+        for theme_idx, batch_results in self.theme_results.items():
+            source_layer = self.theme_layers[theme_idx]
+            if batch_results is not None:
+                continue
+            if source_layer not in extracts:
+                try:
+                    # Works footprint plus the widest buffer ring covers every per-feature check
+                    selection_type = "NEW_SELECTION"
+                    for works_layer in works_layers:
+                        selection = arcpy.management.SelectLayerByLocation(source_layer, "INTERSECT", works_layer, selection_type=selection_type)
+                        selection_type = "ADD_TO_SELECTION"
+                    
+                    # An empty selection counts as no selection - CopyFeatures would copy the whole dataset
+                    if self.get_selection_count(selection) == 0:
+                        arcpy.management.SelectLayerByAttribute(source_layer, "CLEAR_SELECTION")
+                        extracts[source_layer] = None
+                    else:
+                        # Copied in the environment's VICGRID2020, so measures match the batch path
+                        desc = self.get_describe(source_layer)
+                        extract_fc = f"memory\\{desc.baseName}_extract_{theme_idx}_{id(self)}"
+                        self.memory_datasets.add(extract_fc)
+                        arcpy.management.CopyFeatures(source_layer, extract_fc)
+                        arcpy.management.SelectLayerByAttribute(source_layer, "CLEAR_SELECTION")
+                    
+                        layer_name = f"{desc.baseName}_extract_layer_{theme_idx}_{id(self)}"
+                        arcpy.management.MakeFeatureLayer(extract_fc, layer_name)
+                        self.layer_selections[layer_name] = None
+                        extracts[source_layer] = layer_name
+                
+                except Exception as e:
+                    self.logMessage('warn', f"Could not cache extract of {source_layer}, reading from source: {str(e)}")
+                    extracts[source_layer] = source_layer
+            
+            if extracts[source_layer] is None:
+                # Nothing near any works feature - every check reports Nil features
+                self.theme_results[theme_idx] = {"polygon": {}, "buffer": {}}
+            else:
+                self.theme_layers[theme_idx] = extracts[source_layer]
+    
     def clear_layer_selections(self):
         """Clear all layer selections to prevent memory buildup."""
         for layer_name in self.layer_selections:
@@ -156,92 +389,133 @@ class ValuesCheckTool:
             except:
                 pass  # Layer might not exist anymore
 
-    def get_values_present(self, input_feature: str, values_fc: str, checktype: str, *report_fields: str) -> List[List[str]]:
+    @staticmethod
+    def get_selection_count(selection_result: Any) -> int:
+        """Return the selected feature count carried by a SelectLayerByLocation result."""
+        # Outputs are: updated layer, output layer names, count
+        return int(selection_result.getOutput(2))
+    
+    def get_theme_index(self, values_fc: str, fields: List[str]) -> Any:
+        """
+        Return (query function, row store) for a values layer, built on first use. The query
+        function yields store keys of features intersecting a geometry. Returns None if
+        neither shapely 2 nor rtree is installed, or the layer is too large to hold in memory.
+        """
+        key = (values_fc, tuple(fields))
+        if key not in self.theme_indexes:
+            theme_index = None
+            if ((shapely_strtree is not None or rtree_index is not None) 
+                    and int(arcpy.management.GetCount(values_fc)[0]) <= self.INDEX_MAX_FEATURES):
+                store = []  # (geometry, field values), projected to match the works geometries
+                with arcpy.da.SearchCursor(values_fc, ["SHAPE@"] + fields, spatial_reference=self.spatial_ref) as cursor:
+                    for row in cursor:
+                        if row[0] is not None:
+                            store.append((row[0], tuple(row[1:])))
+                
+                if shapely_strtree is not None:
+                    # STRtree answers the exact intersects test in C for all candidates at once
+                    tree = shapely_strtree(shapely_from_wkb([bytes(geom.WKB) for geom, attrs in store]))
+                    def query(input_geom):
+                        return tree.query(self.get_prepared_geometry(input_geom)[0], predicate="intersects")
+                else:
+                    idx = rtree_index.Index()
+                    for position, (geom, attrs) in enumerate(store):
+                        extent = geom.extent
+                        idx.insert(position, (extent.XMin, extent.YMin, extent.XMax, extent.YMax))
+                    def query(input_geom):
+                        # Bounding box candidates, refined by an exact disjoint test - boxes are all in spatial_ref
+                        input_geom = self.project_geometry(input_geom)
+                        extent = input_geom.extent
+                        return (position for position in idx.intersection((extent.XMin, extent.YMin, extent.XMax, extent.YMax))
+                                if not store[position][0].disjoint(input_geom))
+                theme_index = (query, store)
+            self.theme_indexes[key] = theme_index
+        return self.theme_indexes[key]
+    
+    def get_intersecting_rows(self, input_feature: arcpy.Geometry, values_fc: str, 
+                              fields: List[str], with_shape: bool = False) -> List[Tuple[Any, ...]]:
+        """
+        Return field values of values features intersecting the input geometry,
+        with the values geometry appended last if with_shape is set.
+        """
+        theme_index = self.get_theme_index(values_fc, fields)
+        
+        # No index available - fall back to spatial selection on the layer
+        if theme_index is None:
+            values_intersecting = arcpy.management.SelectLayerByLocation(values_fc, "INTERSECT", input_feature, selection_type="NEW_SELECTION")
+            if self.get_selection_count(values_intersecting) == 0:
+                return []
+            with arcpy.da.SearchCursor(values_intersecting, fields + ["SHAPE@"] if with_shape else fields, 
+                                       spatial_reference=self.spatial_ref) as cursor:
+                return list(cursor)
+        
+        query, store = theme_index
+        if with_shape:
+            return [store[position][1] + (store[position][0],) for position in query(input_feature)]
+        return [store[position][1] for position in query(input_feature)]
+    
+    def project_geometry(self, geom: arcpy.Geometry) -> arcpy.Geometry:
+        """Return the geometry in the tool's spatial reference, projecting only if it differs."""
+        sr = geom.spatialReference
+        if sr is None or sr.factoryCode == self.spatial_ref.factoryCode:
+            return geom
+        return geom.projectAs(self.spatial_ref)
+    
+    def get_prepared_geometry(self, input_geom: arcpy.Geometry) -> Tuple[Any, Any]:
+        """
+        Return the input geometry as shapely and prepared shapely, re-used across themes for the same feature.
+        Shapely has no coordinate systems, so the input is projected to match the candidates read in spatial_ref.
+        """
+        if self.prepared_geom[0] is not input_geom:
+            shape = shapely_wkb.loads(bytes(self.project_geometry(input_geom).WKB))
+            self.prepared_geom = (input_geom, shape, shapely_prep(shape))
+        return self.prepared_geom[1], self.prepared_geom[2]
+    
+    def get_values_present(self, input_feature: arcpy.Geometry, values_fc: str, checktype: str, reporting_fields: List[str]) -> List[List[str]]:
         """Get unique values present in intersecting features."""
         try:
-            desc = arcpy.Describe(values_fc)
-            
-            # Spatial selection
-            values_intersecting = arcpy.management.SelectLayerByLocation(values_fc, "INTERSECT", input_feature, selection_type="SUBSET_SELECTION")
-
-            feature_count = int(arcpy.GetCount_management(values_intersecting).getOutput(0))
-            if feature_count == 0:
-                self.logMessage('info', f"{desc.baseName} {checktype} presence results: 0 unique values")
-                return [[]]
+            desc = self.get_describe(values_fc)
             
-            # Get reporting fields
-            reporting_fields = self.get_reporting_fields(list(report_fields))
+            # Reporting fields are filtered once per theme in prepare_layers
             if not reporting_fields:
-                self.logMessage('info', f"{desc.baseName} {checktype} presence results: 0 reporting fields")
+                self.logMessage('detail', f"{desc.baseName} {checktype} presence results: 0 reporting fields")
                 return [[]]
             
-            # Use set for much faster duplicate checking
-            results_set = set()
-            
-            with arcpy.da.SearchCursor(values_intersecting, reporting_fields) as cursor:
-                for row in cursor:
-                    # Process attributes
-                    row_list = []
-                    for val in row:
-                        if isinstance(val, datetime):
-                            row_list.append(val.strftime('%Y-%m-%d'))
-                        elif val is not None:
-                            clean_val = str(val).replace("'", "").replace(",", ";").replace("\n","_n")
-                            row_list.append(clean_val)
-                    
-                    # Add to set (automatic duplicate removal)
-                    results_set.add(tuple(row_list))
+            # Spatial query
+            rows = self.get_intersecting_rows(input_feature, values_fc, reporting_fields)
+            if not rows:
+                self.logMessage('detail', f"{desc.baseName} {checktype} presence results: 0 unique values")
+                return [[]]
             
-            # Convert to list and sort
-            results = [list(item) for item in results_set]
-            results.sort()
+            results = self.summarise_present(rows, self.get_converters(values_fc, reporting_fields))
             
-            self.logMessage('info', f"{desc.baseName} {checktype} presence results: {len(results)} unique values")
+            self.logMessage('detail', f"{desc.baseName} {checktype} presence results: {len(results)} unique values")
             return results
             
         except Exception as e:
             self.logMessage('error', f"Error in get_values_present: {str(e)}")
             return [[]]
     
-    def get_values_count(self, input_feature: str, values_fc: str, checktype: str, *report_fields: str) -> List[List[Any]]:
+    def get_values_count(self, input_feature: arcpy.Geometry, values_fc: str, checktype: str, reporting_fields: List[str]) -> List[List[Any]]:
         """Get intersecting values with their occurrence counts."""
         try:
-            desc = arcpy.Describe(values_fc)
-            
-            # Spatial selection
-            values_intersecting = arcpy.management.SelectLayerByLocation(values_fc, "INTERSECT", input_feature, selection_type="SUBSET_SELECTION")
+            desc = self.get_describe(values_fc)
             
-            feature_count = int(arcpy.GetCount_management(values_intersecting).getOutput(0))
-            if feature_count == 0:
-                self.logMessage('info', f"{desc.baseName} {checktype} count results: 0 unique values")
+            # Reporting fields are filtered once per theme in prepare_layers
+            if not reporting_fields:
+                self.logMessage('detail', f"{desc.baseName} {checktype} count results: 0 reporting values")
                 return [[]]
             
-            reporting_fields = self.get_reporting_fields(list(report_fields))
-            if not reporting_fields:
-                self.logMessage('info', f"{desc.baseName} {checktype} count results: 0 reporting values")
+            # Spatial query
+            rows = self.get_intersecting_rows(input_feature, values_fc, reporting_fields)
+            if not rows:
+                self.logMessage('detail', f"{desc.baseName} {checktype} count results: 0 unique values")
                 return [[]]
             
             # Count occurrences with proper attribute cleaning
-            value_counts = {}
-            with arcpy.da.SearchCursor(values_intersecting, reporting_fields) as cursor:
-                for row in cursor:
-                    # Clean the row data
-                    cleaned_row = []
-                    for val in row:
-                        if isinstance(val, datetime):
-                            cleaned_row.append(val.strftime('%Y-%m-%d'))
-                        elif val is not None:
-                            clean_val = str(val).replace("'", "").replace(",", ";").replace("\n", "_n")
-                            cleaned_row.append(clean_val)
-                    
-                    key = tuple(cleaned_row)
-                    value_counts[key] = value_counts.get(key, 0) + 1
+            results = self.summarise_count(rows, self.get_converters(values_fc, reporting_fields))
             
-            # Format results
-            results = [list(key) + [count] for key, count in value_counts.items()]
-            results.sort()
-            
-            self.logMessage('info', f"{desc.baseName} {checktype} count results: {len(results)} unique values")
+            self.logMessage('detail', f"{desc.baseName} {checktype} count results: {len(results)} unique values")
             
             return results
             
@@ -249,139 +523,151 @@ class ValuesCheckTool:
             self.logMessage('error', f"Error in get_values_count: {str(e)}")
             return [[]]
 
-    def get_values_areas(self, input_feature: str, values_fc: str, checktype: str, *report_fields: str) -> List[List[Any]]:
+    def get_values_areas(self, input_feature: arcpy.Geometry, values_fc: str, checktype: str, reporting_fields: List[str]) -> List[List[Any]]:
         """Get values with their area/length measurements using geometry intersection."""
         try:
-            desc = arcpy.Describe(values_fc)
+            desc = self.get_describe(values_fc)
             
-            # Get the input feature geometry
-            input_geom = None
-            with arcpy.da.SearchCursor(input_feature, ["SHAPE@"]) as cursor:
-                for row in cursor:
-                    input_geom = row[0]
-                    break  # Only need the first (selected) feature
+            # Input feature is passed in as a geometry
+            input_geom = input_feature
             
             if not input_geom:
                 self.logMessage('error', "Could not get input feature geometry")
                 return [[]]
             
-            # First, do spatial selection to reduce dataset size
-            values_intersecting = arcpy.management.SelectLayerByLocation(values_fc, "INTERSECT", input_feature, selection_type="SUBSET_SELECTION")
-            
-            # Check if any features were selected
-            selected_count = int(arcpy.GetCount_management(values_intersecting).getOutput(0))
-            if selected_count == 0:
-                self.logMessage('info', f"{desc.baseName} {checktype} measure results: 0 unique values")
-                return [[]]
-            
-            reporting_fields = self.get_reporting_fields(list(report_fields))
+            # Reporting fields are filtered once per theme in prepare_layers
             if not reporting_fields:
-                self.logMessage('info', f"{desc.baseName} {checktype} measure results: 0 reporting fields")
+                self.logMessage('detail', f"{desc.baseName} {checktype} measure results: 0 reporting fields")
                 return [[]]
             
             # Determine measurement type
             geometry_type = desc.shapeType.upper()
             
-            if geometry_type == "POLYGON":
-                measure_field = "SHAPE@"
+            if shapely_wkb is not None and geometry_type in self.MEASURE_UNITS:
+                # Prepared geometry caches the input's edge index across all candidates
+                shape_input, prepared_input = self.get_prepared_geometry(input_geom)
+                use_area = geometry_type == "POLYGON"
                 def calculate_measure(geom):
+                    candidate = shapely_wkb.loads(bytes(geom.WKB))
+                    if not prepared_input.contains(candidate):
+                        candidate = shape_input.intersection(candidate)
+                    return candidate.area if use_area else candidate.length
+
+            elif geometry_type == "POLYGON":
+                def calculate_measure(geom):
+                    if input_geom.contains(geom):
+                        return geom.area  # wholly inside - no clip needed
                     intersected = geom.intersect(input_geom, dimension=4)  # 4 = polygon intersection
                     if intersected:
-                        return intersected.getArea()
+                        return intersected.area  # planar area in spatial reference units
                     return 0
 
-                unit_conversion = lambda x: f"{x / 10000:.1f}ha"
-
             elif geometry_type == "POLYLINE":
-                measure_field = "SHAPE@"
                 def calculate_measure(geom):
+                    if input_geom.contains(geom):
+                        return geom.length  # wholly inside - no clip needed
                     intersected = geom.intersect(input_geom, dimension=2) # 2 = line intersection 
                     if intersected and intersected.type in ["polyline", "multipart"]:
-                        length = intersected.getLength()
-                        return length if length is not None else 0
+                        return intersected.length or 0  # planar length in spatial reference units
                     return 0
-                            
-                unit_conversion = lambda x: f"{x / 1000:.3f}km"
 
             else:
                 self.logMessage('error', f"Unsupported geometry type: {geometry_type}")
                 return [[]]
             
-            fields = reporting_fields + [measure_field]
+            # Spatial query to reduce dataset size, with values geometry last
+            rows = self.get_intersecting_rows(input_feature, values_fc, reporting_fields, with_shape=True)
+            if not rows:
+                self.logMessage('detail', f"{desc.baseName} {checktype} measure results: 0 unique values")
+                return [[]]
             
-            # Aggregate measurements by attributes using geometry intersection
-            value_measures = {}
+            # Measure intersection of each values feature with the input geometry
+            measured_rows = []
             processed_count = 0
             
-            with arcpy.da.SearchCursor(values_intersecting, fields) as cursor:
-                for row in cursor:
-                    try:
-                        # Calculate intersection measure
-                        feature_geom = row[-1]
-                        intersected_measure = calculate_measure(feature_geom)
-                        
-                        if intersected_measure > 0:  # Only include if there's actual intersection
-                            # Clean attribute values
-                            attrs = []
-                            for val in row[:-1]:
-                                if isinstance(val, datetime):
-                                    attrs.append(val.strftime('%Y-%m-%d'))
-                                else:
-                                    clean_val = str(val).replace("'", "").replace(",", ";").replace("\n","_n")
-                                    if len(clean_val) > 200:
-                                        clean_val = clean_val[:200] + "..."
-                                    attrs.append(clean_val)
-                            
-                            total_len = sum(len(attr) for attr in attrs) + 3 * (len(attrs) - 1)
-
-                            while total_len > 200:
-                                # Find the longest attribute
-                                longest_idx = max(range(len(attrs)), key=lambda i: len(attrs[i]))
-                                longest_attr = attrs[longest_idx]
-                                longest_len = len(longest_attr)
-                                
-                                # Remove existing ellipsis if present
-                                if longest_attr.endswith("..."):
-                                    longest_attr = longest_attr[:-3]  # Remove the "..."
-                                    longest_len = len(longest_attr)
-
-                                # Trim one character from longest attribute, then add the elipsis
-                                new_length = longest_len - 1
-                                attrs[longest_idx] = longest_attr[:new_length] + "..."
-
-                                # re-calculate total length
-                                total_len = sum(len(attr) for attr in attrs) + 3 * (len(attrs) - 1)
-                            
-                            key = tuple(attrs)
-                            value_measures[key] = value_measures.get(key, 0) + intersected_measure
-                        processed_count += 1
-                        
-                    except Exception as geom_error:
-                        self.logMessage('warn', f"Geometry processing error for feature {processed_count}: {str(geom_error)}")
-                        continue
-            
-            # Format results
-            results = []
-            for key, total_measure in value_measures.items():
-                if total_measure > 0:  # Only include non-zero measurements
-                    measure_str = unit_conversion(total_measure)
-                    results.append(list(key) + [measure_str])
-            
-            results.sort()
-            self.logMessage('info', f"{desc.baseName} {checktype} measure results: {len(results)} unique values from {processed_count} features")
+            for row in rows:
+                try:
+                    measured_rows.append((row[:-1], calculate_measure(row[-1])))
+                    processed_count += 1
+                    
+                except Exception as geom_error:
+                    self.logMessage('warn', f"Geometry processing error for feature {processed_count}: {str(geom_error)}")
+                    continue
+            
+            # Aggregate measurements by attributes
+            results = self.summarise_measure(measured_rows, geometry_type, self.get_converters(values_fc, reporting_fields))
+            self.logMessage('detail', f"{desc.baseName} {checktype} measure results: {len(results)} unique values from {processed_count} features")
             return results
             
         except Exception as e:
             self.logMessage('error', f"Error in get_values_areas_no_clip: {str(e)}")
             return [[]]
     
+    @staticmethod
+    def summarise_present(rows: Any, converters: List[callable]) -> List[List[str]]:
+        """Return the sorted unique cleaned attribute rows."""
+        # Use set for much faster duplicate checking
+        results_set = {ValuesCheckTool._clean_row(row, converters) for row in rows}
+        return [list(item) for item in sorted(results_set)]
+    
+    @staticmethod
+    def summarise_count(rows: Any, converters: List[callable]) -> List[List[Any]]:
+        """Return cleaned attribute rows with their occurrence counts, sorted."""
+        value_counts = Counter(ValuesCheckTool._clean_row(row, converters) for row in rows)
+        
+        results = [list(key) + [count] for key, count in value_counts.items()]
+        results.sort()
+        return results
+    
+    @staticmethod
+    def _fit_attrs(attrs: List[str], limit: int = 200) -> List[str]:
+        """Trim the longest attributes with an ellipsis so the joined length fits within limit."""
+        overhead = 3 * (len(attrs) - 1)  # " | " separators
+        if sum(len(attr) for attr in attrs) + overhead <= limit:
+            return attrs
+        
+        # Binary search for the largest per-attribute length that fits
+        low, high = 3, max(len(attr) for attr in attrs)
+        while low < high:
+            cap = (low + high + 1) // 2
+            if sum(min(len(attr), cap) for attr in attrs) + overhead <= limit:
+                low = cap
+            else:
+                high = cap - 1
+        
+        return [attr if len(attr) <= low else attr[:low - 3] + "..." for attr in attrs]
+    
+    def summarise_measure(self, measured_rows: Any, geometry_type: str, converters: List[callable]) -> List[List[Any]]:
+        """Total measures by cleaned attributes; measured_rows holds (attributes, measure) pairs."""
+        raw_measures = defaultdict(float)
+        
+        for row, intersected_measure in measured_rows:
+            if intersected_measure > 0:  # Only include if there's actual intersection
+                # Clean attribute values
+                key = tuple(convert(val) for convert, val in zip(converters, row))
+                raw_measures[key] += intersected_measure
+        
+        # Trim long attributes once per distinct value, merging any that trim alike
+        value_measures = defaultdict(float)
+        for attrs, total_measure in raw_measures.items():
+            value_measures[tuple(self._fit_attrs(list(attrs)))] += total_measure
+        
+        # Format results, only including non-zero measurements
+        divisor, decimals, unit = self.MEASURE_UNITS[geometry_type]
+        results = [
+            list(key) + [f"{total_measure / divisor:.{decimals}f}{unit}"]
+            for key, total_measure in value_measures.items() if total_measure > 0
+        ]
+        results.sort()
+        return results
+    
     def format_presence_output(self, value_list: List[Any]) -> str:
         """Format presence results for output."""
         if not value_list or (len(value_list) == 1 and not value_list[0]):
             return ""
         
-        # Clean the list
-        cleaned = [str(item).replace(",", ";") for item in value_list 
+        # Values are already CSV-safe from _clean_row / summarise_measure
+        cleaned = [str(item) for item in value_list 
                   if item and str(item).strip() and str(item) != "None"]
         
         if not cleaned:
@@ -398,8 +684,8 @@ class ValuesCheckTool:
         if not value_list or (len(value_list) == 1 and not value_list[0]):
             return ""
         
-        # Clean the list
-        cleaned = [str(item).replace(",", ";") for item in value_list 
+        # Values are already CSV-safe from _clean_row / summarise_measure
+        cleaned = [str(item) for item in value_list 
                   if item and str(item).strip() and str(item) != "None"]
         
         if not cleaned:
@@ -426,84 +712,156 @@ class ValuesCheckTool:
         else:  # Default to areas/measures
             return self.get_values_areas, self.format_measure_output
     
-    def process_feature(self, feature_name: str, field_type: str, output_file: Any) -> None:
-        """Process a single feature for values checking."""
+    def _process_theme_batch(self, theme_idx: int) -> Any:
+        """
+        Intersect one theme with all works features (and their buffer) in a single pass.
+        Returns results keyed by location ("polygon"/"buffer") then feature ID, or
+        None if the theme must be checked one feature at a time.
+        PRESENT/COUNT use a one-to-many spatial join, so values features that only touch
+        a works boundary are reported as the per-feature selection did, and each values
+        feature counts once per ID. MEASURE intersects works dissolved by ID, so parts
+        sharing an ID are measured as one, as cache_feature_geometries unions them.
+        """
+        (requires_check, default_ws, location, gdb_name, fc_name, 
+            query, method, repfld1, repfld2, repfld3, repfld4, 
+            buffer_distance) = self.theme_rows[theme_idx]
+        
+        theme_layer = self.theme_layers[theme_idx]
+        desc = self.get_describe(theme_layer)
+        method = method.upper()
+        
+        # Works layers to intersect with, by location
+        feature_class = self.input_basename
+        works_layers = {"polygon": self.buffer_cache[feature_class]}
+        if buffer_distance and buffer_distance > 0:
+            works_layers["buffer"] = self.buffer_cache[f"{feature_class}_{buffer_distance}"]
+        
+        reporting_fields = self.theme_checks[theme_idx][2]
+        if not reporting_fields:
+            self.logMessage('info', f"{desc.baseName} batch results: 0 reporting fields")
+            return {location: {} for location in works_layers}
+        
+        # Joins rename fields that clash between works and values - check these per feature
+        works_fields = {field.name.upper() for field in self.get_describe(self.input_fc).fields}
+        values_fields = {field.name.upper() for field in desc.fields}
+        if any(field.upper() in works_fields for field in reporting_fields) or self.id_field.upper() in values_fields:
+            self.logMessage('info', f"{desc.baseName} fields clash with works fields, checking per feature")
+            return None
+        
+        # Choose aggregation for method; measures are read from the intersected shape
+        fields = [self.id_field] + reporting_fields
+        converters = self.get_converters(theme_layer, reporting_fields)
+        if method == "PRESENT":
+            fields.insert(1, "TARGET_FID")  # values feature, to count each once per ID
+            summarise = lambda rows: self.summarise_present(rows, converters)
+        elif method == "COUNT":
+            fields.insert(1, "TARGET_FID")
+            summarise = lambda rows: self.summarise_count(rows, converters)
+        else:
+            geometry_type = desc.shapeType.upper()
+            if geometry_type not in self.MEASURE_UNITS:
+                self.logMessage('error', f"Unsupported geometry type: {geometry_type}")
+                return {location: {} for location in works_layers}
+            
+            fields.append("SHAPE@AREA" if geometry_type == "POLYGON" else "SHAPE@LENGTH")
+            summarise = lambda rows: self.summarise_measure(((row[:-1], row[-1]) for row in rows), geometry_type, converters)
+        
         try:
-            # Create selection expression
-            if field_type.upper() == "STRING":
-                expression = f"{self.id_field} = '{feature_name}'"
-            else:
-                expression = f"{self.id_field} = {feature_name}"
+            batch_results = {}
+            joined_fc = f"memory\\theme_batch_{id(self)}"
+            self.memory_datasets.add(joined_fc)  # deleted after each use, unless the batch fails
             
+            for location, works_layer in works_layers.items():
+                rows_by_feature = defaultdict(list)
+                
+                if method in ("PRESENT", "COUNT"):
+                    # Intersect test only, matching SelectLayerByLocation INTERSECT (touching included)
+                    arcpy.analysis.SpatialJoin(theme_layer, works_layer, joined_fc, "JOIN_ONE_TO_MANY", 
+                                               "KEEP_COMMON", match_option="INTERSECT")
+                    
+                    # Group joined rows by works feature ID, once per values feature
+                    seen = set()
+                    with arcpy.da.SearchCursor(joined_fc, fields) as cursor:
+                        for row in cursor:
+                            if row[:2] not in seen:
+                                seen.add(row[:2])
+                                rows_by_feature[row[0]].append(row[2:])
+                else:
+                    arcpy.analysis.PairwiseIntersect([self.get_dissolved_works(works_layer), theme_layer], joined_fc, "ALL")
+                    
+                    # Group intersected rows by works feature ID
+                    with arcpy.da.SearchCursor(joined_fc, fields) as cursor:
+                        for row in cursor:
+                            rows_by_feature[row[0]].append(row[1:])
+                arcpy.Delete_management(joined_fc)
+                
+                batch_results[location] = {feature_id: summarise(rows) for feature_id, rows in rows_by_feature.items()}
+                self.logMessage('info', f"{desc.baseName} {location} batch results: {len(rows_by_feature)} features intersected")
+            
+            return batch_results
+        
+        except Exception as e:
+            self.logMessage('warn', f"Batch intersection failed for {desc.baseName}, checking per feature: {str(e)}")
+            return None
+    
+    def get_dissolved_works(self, works_layer: str) -> str:
+        """Return the works layer dissolved on the ID field, built on first use."""
+        if works_layer not in self.dissolved_works:
+            dissolved_fc = f"memory\\{works_layer}_by_id"
+            self.memory_datasets.add(dissolved_fc)
+            arcpy.analysis.PairwiseDissolve(works_layer, dissolved_fc, self.id_field, multi_part="MULTI_PART")
+            self.dissolved_works[works_layer] = dissolved_fc
+        return self.dissolved_works[works_layer]
+    
+    def process_feature(self, feature_name: str, output_file: Any) -> None:
+        """Process a single feature for values checking."""
+        # Row output is collected here and written once per feature
+        parts = []
+        try:
             self.counter += 1
             
-            self.logMessage('info', f"\nProcessing feature {self.counter}: {expression}")
+            self.logMessage('detail', f"\nProcessing feature {self.counter}: {self.id_field} = {feature_name}")
             
             # Write feature name to output
-            output_file.write(str(feature_name))
-            
-            # Select current feature from buffer cache
-            feature_class = self.get_basename(self.input_fc)
-            feature_layer = self.buffer_cache[feature_class]
-            current_feature = arcpy.management.SelectLayerByAttribute(feature_layer, "NEW_SELECTION", expression)
-            
-            # Process each theme in reference table
-            theme_fields = [
-                "CHECK_YN", "DEFAULTWS_YN", "DATA_LOC", "GDB_NAME", "FC_NAME",
-                "DEF_QUERY", "CHECK_METHOD", "REPFLD1", "REPFLD2", "REPFLD3", 
-                "REPFLD4", "BUFFER_DIST"
-            ]
+            parts.append(str(feature_name))
             
-            with arcpy.da.SearchCursor(self.ref_table, theme_fields) as cursor:
-                for row in cursor:
-                    (requires_check, default_ws, location, gdb_name, fc_name, 
-                        query, method, repfld1, repfld2, repfld3, repfld4, 
-                        buffer_distance) = row
-
-                    if requires_check.upper() != "Y":  # Skip if CHECK_YN != "Y"
-                        continue
-                    
-                    # Get theme data from cache
-                    theme_layer = self.values_cache[fc_name]
-
-                    # Apply definition query if specified
-                    if query and len(query.strip()) > 1:
-                        # theme_layer = arcpy.management.SelectLayerByAttribute(theme_layer, "NEW_SELECTION", query)
-                        arcpy.management.SelectLayerByAttribute(theme_layer, "NEW_SELECTION", query)
+            feature_class = self.input_basename
+            
+            # Process each theme in reference table (rows cached in run)
+            for theme_idx, row in enumerate(self.theme_rows):
+                buffer_distance = row[-1]
+                
+                # Get theme layer from cache (built once per run, definition query applied)
+                theme_layer = self.theme_layers[theme_idx]
+                
+                # Get functions and reporting fields resolved in prepare_layers
+                check_func, format_func, reporting_fields = self.theme_checks[theme_idx]
+                
+                # Use batch results if available, otherwise check values within feature
+                batch_results = self.theme_results.get(theme_idx)
+                if batch_results is not None:
+                    results = batch_results["polygon"].get(feature_name, [[]])
+                else:
+                    current_feature = self.feature_geoms[feature_class][feature_name]
+                    results = check_func(current_feature, theme_layer, "polygon", reporting_fields)
+                
+                # Write results
+                self._write_results(parts, results, format_func)
+                
+                # Check buffer if specified
+                if buffer_distance and buffer_distance > 0:
+                    if batch_results is not None:
+                        buffer_results = batch_results["buffer"].get(feature_name, [[]])
                     else:
-                        # theme_layer = arcpy.management.SelectLayerByAttribute(theme_layer, "CLEAR_SELECTION")
-                        arcpy.management.SelectLayerByAttribute(theme_layer, "CLEAR_SELECTION")
-                    
-                    # Get method and reporting fields
-                    reporting_fields = [repfld1, repfld2, repfld3, repfld4]
-                    
-                    # Get appropriate functions
-                    check_func, format_func = self.get_method_functions(method)
-                    
-                    # Check values within feature
-                    results = check_func(current_feature, theme_layer, "polygon", *reporting_fields)
-                    
-                    # Write results
-                    self._write_results(output_file, results, format_func)
-                    
-                    # Check buffer if specified
-                    if buffer_distance and buffer_distance > 0:
                         buffer_name = f"{feature_class}_{buffer_distance}"
-                        buffer_layer = self.buffer_cache[buffer_name]
-                        buffer_feature = arcpy.management.SelectLayerByAttribute(buffer_layer, "NEW_SELECTION", expression)
-
-                        # reset selection - required because previous check may have reduced selection
-                        if query and len(query.strip()) > 1:
-                            # theme_layer = arcpy.management.SelectLayerByAttribute(theme_layer, "NEW_SELECTION", query)
-                            arcpy.management.SelectLayerByAttribute(theme_layer, "NEW_SELECTION", query)
-                        else:
-                            # theme_layer = arcpy.management.SelectLayerByAttribute(theme_layer, "CLEAR_SELECTION")
-                            arcpy.management.SelectLayerByAttribute(theme_layer, "CLEAR_SELECTION")
-                        self._process_buffer(buffer_feature, theme_layer, buffer_distance, 
-                            check_func, format_func, output_file, results, *reporting_fields)
-            
+                        buffer_feature = self.feature_geoms[buffer_name][feature_name]
+                        buffer_results = check_func(buffer_feature, theme_layer, f"{buffer_distance}m buffer", reporting_fields)
+                    
+                    self._process_buffer(buffer_results, buffer_distance, format_func, parts, results)
+        
             # Finish the row
-            output_file.write("\n")
+            parts.append("\n")
+            output_file.write("".join(parts))
 
             # Periodic cleanup every 100 features
             if self.counter % 100 == 0:
@@ -513,44 +871,39 @@ class ValuesCheckTool:
             
         except Exception as e:
             self.logMessage('error', f"Error processing feature {feature_name}: {str(e)}")
-            output_file.write(",Error occurred\n")
+            output_file.write("".join(parts) + ",Error occurred\n")
 
         finally:
             self.clear_layer_selections()
     
-    def _write_results(self, output_file: Any, results: List[List[Any]], 
+    def _write_results(self, parts: List[str], results: List[List[Any]], 
                       format_func: callable) -> None:
-        """Write results to output file."""
+        """Append formatted results to the output row parts."""
         if not results or (len(results) == 1 and not results[0]):
-            output_file.write(',="Nil features"')
+            parts.append(',="Nil features"')
         elif len(results) == 1:
-            formatted = format_func(results[0])
-            output_file.write(f',="{formatted}"')
+            formatted = self.quote_formula(format_func(results[0]))
+            parts.append(f',="{formatted}"')
         else:
             # Multiple results
             formatted_results = []
             for result in results:
                 formatted = format_func(result)
                 if formatted:
-                    formatted_results.append(formatted)
+                    formatted_results.append(self.quote_formula(formatted))
             
             if formatted_results:
-                output_file.write(f',="{formatted_results[0]}"')
+                parts.append(f',="{formatted_results[0]}"')
                 for result in formatted_results[1:]:
-                    output_file.write(f'& CHAR(10) & "{result}"')
+                    parts.append(f'& CHAR(10) & "{result}"')
             else:
-                output_file.write(',="Nil features"')
-    
-    def _process_buffer(self, buffer_feature: str, theme_layer: str, 
-                       buffer_dist: float, check_func: callable, 
-                       format_func: callable, output_file: Any, 
-                       main_results: List[List[Any]],
-                       *reporting_fields: str) -> None:
-        """Process buffer area around feature."""
+                parts.append(',="Nil features"')
+    
+    def _process_buffer(self, buffer_results: List[List[Any]], 
+                       buffer_dist: float, format_func: callable, 
+                       parts: List[str], main_results: List[List[Any]]) -> None:
+        """Append results for the buffer area around feature to the output row parts."""
         try:
-           
-            # Check values in buffer
-            buffer_results = check_func(buffer_feature, theme_layer, f"{buffer_dist}m buffer", *reporting_fields) 
             
             # Determine if main results were empty
             has_main_results = (main_results and not (len(main_results) == 1 and not main_results[0]))
@@ -559,17 +912,17 @@ class ValuesCheckTool:
             prefix = " & CHAR(10) &" if has_main_results else "&"
             
             if not buffer_results or (len(buffer_results) == 1 and not buffer_results[0]):
-                output_file.write(
+                parts.append(
                     f'{prefix} CHAR(10) & "Within Buffer Area ({buffer_dist}m): Nil features"'
                 )
             else:
-                output_file.write(
+                parts.append(
                     f'{prefix} CHAR(10) & "Within Buffer Area ({buffer_dist}m):"'
                 )
                 for result in buffer_results:
                     formatted = format_func(result)
                     if formatted:
-                        output_file.write(f' & CHAR(10) & "{formatted}"')
+                        parts.append(f' & CHAR(10) & "{self.quote_formula(formatted)}"')
                         
         except Exception as e:
             self.logMessage('error', f"Error processing buffer: {str(e)}")
@@ -577,18 +930,18 @@ class ValuesCheckTool:
     def run(self) -> None:
         """Execute the main values checking process."""
         try:
-            timestamp = self.get_timestamp()
+            timestamp = self.timestamp
 
             
             # Create output CSV
             output_csv_path = os.path.join(
                 self.output_path, 
-                f"{timestamp}_{self.get_basename(self.input_fc)}_ValuesCheck.csv"
+                f"{timestamp}_{self.input_basename}_ValuesCheck.csv"
             )
             
             self.logMessage('info', f"Output CSV: {output_csv_path}")
 
-            with open(output_csv_path, "w") as output_file:
+            with open(output_csv_path, "w", buffering=1 << 20, newline="") as output_file:
                 
                 self.logMessage('info', f"Script started: {datetime.now()}")
                 # self._log(f"Script started: {datetime.now()}")
@@ -599,58 +952,34 @@ class ValuesCheckTool:
                 # Get list of unique features
                 feature_list = self._get_unique_features()
                 
-                # Get field type for expression building
-                field_type = self._get_field_type()
-                
                 # Set up progress indicator
                 arcpy.SetProgressor(
                     "step", "Checking for values intersecting features...", 
                     0, len(feature_list), 1
                 )
                 
-                # Pre-cache and buffer feature class; pre-cache values layers
-                theme_fields = [
-                    "CHECK_YN", "DEFAULTWS_YN", "DATA_LOC", "GDB_NAME", "FC_NAME",
-                    "DEF_QUERY", "CHECK_METHOD", "REPFLD1", "REPFLD2", "REPFLD3", 
-                    "REPFLD4", "BUFFER_DIST"
-                ]
+                # Cache reference table, values layers and works buffers
+                self.prepare_layers()
                 
-                buffer_distances = []
-                with arcpy.da.SearchCursor(self.ref_table, theme_fields) as cursor:
-                    for row in cursor:
-                        (requires_check, default_ws, location, gdb_name, fc_name, 
-                         query, method, repfld1, repfld2, repfld3, repfld4, 
-                         buffer_distance) = row
-
-                        if requires_check.upper() != "Y":  # Skip if CHECK_YN != "Y"
-                            continue
-                        
-                        if default_ws.upper() == "Y": 
-                            theme_path = os.path.join(self.csdl_location, location, gdb_name, fc_name)
-                        else:
-                            theme_path = location  # DATA_LOC
-                        
-                        # Cache values layer with unique name
-                        if fc_name not in self.values_cache:
-                            layer_name = f"{fc_name}_{id(self)}"
-                            arcpy.management.MakeFeatureLayer(theme_path, layer_name)
-                            self.values_cache[fc_name] = layer_name
-                            self.layer_selections[layer_name] = None
-                            self.logMessage('info', f"Cached {fc_name}")
-
-                        # Add buffer distance to list if required
-                        if buffer_distance not in buffer_distances and buffer_distance > 0:
-                            buffer_distances.append(buffer_distance)
-                        
-                self.logMessage('info', f"Caching {self.input_fc} and {len(buffer_distances)} buffers")
+                # Intersect each theme with all features at once
+                for theme_idx in range(len(self.theme_rows)):
+                    self.theme_results[theme_idx] = self._process_theme_batch(theme_idx)
                 
-                self.cache_buffers(self.input_fc, buffer_distances)
-
+                # Feature geometries are only needed for themes checked one feature at a time
+                if WORKERS <= 1 and None in self.theme_results.values():
+                    self.cache_feature_geometries()
+                    self.cache_theme_extracts()
+                self.clear_layer_selections()
 
-                # Process each feature
-                for feature_name in feature_list:
-                    self.process_feature(feature_name, field_type, output_file)
-                    arcpy.SetProgressorPosition()
+                # Process each feature, in worker processes if themes still need per-feature checks
+                if WORKERS > 1 and None in self.theme_results.values():
+                    self._process_features_parallel(feature_list, output_file)
+                else:
+                    for position, feature_name in enumerate(feature_list, 1):
+                        self.process_feature(feature_name, output_file)
+                        # Update the progressor every PROGRESS_STEP features to limit UI round-trips
+                        if position % self.PROGRESS_STEP == 0 or position == len(feature_list):
+                            arcpy.SetProgressorPosition(position)
                 
                 self.logMessage('info', f"\nScript completed. Total features processed: {self.counter}")
             
@@ -661,46 +990,127 @@ class ValuesCheckTool:
         finally:
             self._cleanup()
     
+    def load_theme_rows(self) -> None:
+        """Read the reference table once; rows are re-used for the header and every feature."""
+        where_clause = f"UPPER({arcpy.AddFieldDelimiters(self.ref_table, 'CHECK_YN')}) = 'Y'"
+        with arcpy.da.SearchCursor(self.ref_table, self.THEME_FIELDS + ["THEMENAME"], where_clause) as cursor:
+            rows = [tuple(row) for row in cursor]
+        self.theme_rows = [row[:-1] for row in rows]
+        self.theme_names = [row[-1] for row in rows]
+    
+    def prepare_layers(self) -> None:
+        """Read the reference table and cache values layers and works buffers."""
+        if not self.theme_rows:
+            self.load_theme_rows()
+        
+        # Pre-cache and buffer feature class; pre-cache values layers
+        buffer_distances = set()
+        for row in self.theme_rows:
+            (requires_check, default_ws, location, gdb_name, fc_name, 
+             query, method, repfld1, repfld2, repfld3, repfld4, 
+             buffer_distance) = row
+            
+            theme_path = self.get_theme_path(default_ws, location, gdb_name, fc_name)
+            where_clause = query if query and len(query.strip()) > 1 else None
+            
+            # Cache values layer with unique name and definition query, once per path and query
+            cache_key = (theme_path, where_clause)
+            if cache_key not in self.values_cache:
+                layer_name = f"{fc_name}_{len(self.values_cache)}_{id(self)}"
+                arcpy.management.MakeFeatureLayer(theme_path, layer_name, where_clause)
+                self.values_cache[cache_key] = layer_name
+                self.layer_selections[layer_name] = None
+                self.logMessage('info', f"Cached {fc_name}")
+            self.theme_layers.append(self.values_cache[cache_key])
+            
+            # Resolve method and reporting fields once rather than per feature
+            check_func, format_func = self.get_method_functions(method)
+            reporting_fields = self.get_reporting_fields([repfld1, repfld2, repfld3, repfld4])
+            self.theme_checks.append((check_func, format_func, reporting_fields))
+
+            # Add buffer distance to list if required
+            if buffer_distance and buffer_distance > 0:
+                buffer_distances.add(buffer_distance)
+            
+        self.ensure_spatial_indexes()
+        
+        self.logMessage('info', f"Caching {self.input_fc} and {len(buffer_distances)} buffers")
+        
+        self.cache_buffers(self.input_fc, sorted(buffer_distances))
+    
+    def _process_features_parallel(self, feature_list: List[Any], output_file: Any) -> None:
+        """Split features across WORKERS processes and write their rows in feature order."""
+        if not feature_list:
+            return  # nothing to split - the header is already written
+        
+        # Script tools run inside ArcGISPro.exe, so workers must be started with python.exe
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+        
+        chunk_size = -(-len(feature_list) // WORKERS)  # ceiling division
+        chunks = [feature_list[i:i + chunk_size] for i in range(0, len(feature_list), chunk_size)]
+        params = (self.input_fc, self.id_field, self.ref_table, self.csdl_location, self.output_path)
+        
+        self.logMessage('info', f"Processing {len(feature_list)} features in {len(chunks)} worker processes")
+        
+        with ProcessPoolExecutor(max_workers=WORKERS) as executor:
+            futures = [
+                executor.submit(_process_feature_chunk, params, chunk, self.theme_results, worker_id)
+                for worker_id, chunk in enumerate(chunks, 1)
+            ]
+            # Collect in submission order so rows stay sorted by feature
+            for chunk, future in zip(chunks, futures):
+                output_file.write(future.result())
+                self.counter += len(chunk)
+                arcpy.SetProgressorPosition(self.counter)
+    
     def _write_csv_header(self, output_file: Any) -> None:
         """Write CSV header row."""
-        output_file.write(f"{self.id_field}")
-
-        with arcpy.da.SearchCursor(self.ref_table, ["CHECK_YN", "THEMENAME"]) as cursor:
-            for row in cursor:
-                if row[0].upper() == "Y":
-                    output_file.write(f",{row[1]}")
-        output_file.write("\n")
+        if not self.theme_names:
+            self.load_theme_rows()
+        # One quoted write, so theme names containing commas keep their column
+        csv.writer(output_file, lineterminator="\n").writerow([self.id_field] + self.theme_names)
     
     def _get_unique_features(self) -> List[str]:
         """Get sorted list of unique feature identifiers."""
-        feature_list = []
         with arcpy.da.SearchCursor(self.input_fc, [self.id_field]) as cursor:
-            for row in cursor:
-                if row[0] not in feature_list:
-                    feature_list.append(row[0])
-        
-        feature_list.sort()
+            feature_list = sorted({row[0] for row in cursor})
         self.logMessage('info', f"{len(feature_list)} unique features found")
         return feature_list
     
     def _get_field_type(self) -> str:
         """Get the field type of the ID field."""
-        desc = arcpy.Describe(self.input_fc)
-        for field in desc.fields:
-            if field.name == self.id_field:
+        if self.id_field_type is not None:
+            return self.id_field_type
+        
+        # Field names are case-insensitive in geodatabases
+        id_field = self.id_field.upper()
+        for field in self.get_describe(self.input_fc).fields:
+            if field.name.upper() == id_field:
+                self.id_field_type = field.type
                 return field.type
         
         raise ValueError(f"Field '{self.id_field}' not found in {self.input_fc}")
 
     def logMessage(self, type, message: str) -> None:
-        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        """Log to the performance file; 'detail' messages stay out of the geoprocessing window."""
+        # Format the time once per second rather than once per message
+        second = int(time.time())
+        if second != self.log_time[0]:
+            self.log_time = (second, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second)))
+        now = self.log_time[1]
         try:
+            # Open lazily with a 64 KB buffer; only errors force a flush
+            if self.perf_log is None:
+                self.perf_log = open(self.perf_log_path, "a", buffering=1 << 16)
             self.perf_log.write(f"{now} {message}\n")
-            self.perf_log.flush()
+            if type == "error":
+                self.perf_log.flush()
         except Exception as e:
             # Fallback if file writing fails
             print(f"Log write error: {e}")
         
+        if not self.echo_messages or type == "detail":
+            return  # per-feature detail is file-only; the progressor shows progress
         if type == "error":
             arcpy.AddError(message)
         elif type == "warn":
@@ -712,24 +1122,64 @@ class ValuesCheckTool:
         """Clean up temporary files and workspace."""
         try:
             if self.temp_gdb and arcpy.Exists(self.temp_gdb):
-                # Clean up any remaining feature classes
-                arcpy.env.workspace = self.temp_gdb
-                temp_fcs = arcpy.ListFeatureClasses()
-                for fc in temp_fcs:
-                    try:
-                        arcpy.Delete_management(fc)
-                    except:
-                        pass  # Continue cleanup even if individual deletions fail
-                
-                # Delete the temporary geodatabase
+                # Deleting the geodatabase removes its feature classes with it
                 try:
                     arcpy.Delete_management(self.temp_gdb)
                     self.logMessage('info', "Temporary workspace cleaned up")
                 except:
+                    # Likely a lock - clear what can be deleted and leave the geodatabase
+                    arcpy.env.workspace = self.temp_gdb
+                    temp_fcs = arcpy.ListFeatureClasses()
+                    if temp_fcs:
+                        try:
+                            arcpy.Delete_management(temp_fcs)  # one tool call for all
+                        except:
+                            pass  # Continue cleanup even if deletions fail
                     self.logMessage('warn', f"Could not delete temporary workspace: {self.temp_gdb}")
                     
+            # Release only this tool's datasets - the memory workspace is shared with the Pro session
+            memory_datasets = [fc for fc in self.memory_datasets if arcpy.Exists(fc)]
+            if memory_datasets:
+                arcpy.Delete_management(memory_datasets)  # one tool call for all
+            self.memory_datasets.clear()
+                    
         except Exception as e:
             self.logMessage('warn', f"Error during cleanup: {str(e)}")
+        
+        # Write out any buffered log lines
+        if self.perf_log is not None:
+            self.perf_log.close()
+            self.perf_log = None
+
+def _process_feature_chunk(params: Tuple[str, ...], feature_names: List[Any], 
+                           theme_results: dict, worker_id: int) -> str:
+    """
+    Worker process entry point. Builds its own layers, processes a chunk of
+    features and returns their CSV rows.
+    """
+    tool = ValuesCheckTool(*params, log_name=f"worker{worker_id}_performance")
+    tool.echo_messages = False  # worker messages never reach the tool dialog; keep them in the worker log
+    arcpy.env.parallelProcessingFactor = f"{max(1, 75 // WORKERS)}%"  # share the parent's 75% between workers
+    try:
+        tool.prepare_layers()
+        tool.cache_feature_geometries(feature_names)
+        tool.theme_results = theme_results
+        tool.cache_theme_extracts()
+        
+        rows = io.StringIO()
+        for feature_name in feature_names:
+            tool.process_feature(feature_name, rows)
+        return rows.getvalue()
+    
+    finally:
+        tool._cleanup()
+
+def _dataset_exists(path: str) -> bool:
+    """arcpy.Exists, answered from the file system when the file geodatabase itself is missing."""
+    gdb_end = path.lower().find(".gdb")
+    if gdb_end != -1 and not os.path.isdir(path[:gdb_end + 4]):
+        return False
+    return arcpy.Exists(path)
 
 def script_tool(input_fc: str, id_field: str, ref_table: str, 
                csdl_location: str, output_path: str) -> None:
@@ -744,18 +1194,22 @@ def script_tool(input_fc: str, id_field: str, ref_table: str,
     - output_path: Output directory path
     """
     try:
-        # Validate inputs
-        if not arcpy.Exists(input_fc):
-            raise ValueError(f"Input feature class does not exist: {input_fc}")
+        # Validate inputs, cheapest and most often mistyped first
+        if not os.path.isdir(csdl_location):
+            raise ValueError(f"CSDL location is not an existing folder: {csdl_location}")
         
-        if not arcpy.Exists(ref_table):
+        if not _dataset_exists(ref_table):
             raise ValueError(f"Reference table does not exist: {ref_table}")
         
-        if not os.path.exists(csdl_location):
-            raise ValueError(f"CSDL location does not exist: {csdl_location}")
+        # Describe doubles as the existence check and is handed on to the tool
+        try:
+            input_desc = arcpy.Describe(input_fc)
+        except Exception:
+            raise ValueError(f"Input feature class does not exist: {input_fc}")
         
         # Create and run the tool
-        tool = ValuesCheckTool(input_fc, id_field, ref_table, csdl_location, output_path)
+        tool = ValuesCheckTool(input_fc, id_field, ref_table, csdl_location, output_path,
+                               describe_cache={input_fc: input_desc})
         tool.run()
         
         arcpy.AddMessage("Values check completed successfully!")
@@ -764,11 +1218,19 @@ def script_tool(input_fc: str, id_field: str, ref_table: str,
         arcpy.AddError(f"Script execution failed: {str(e)}")
         raise
 if __name__ == "__main__":
-    # Get parameters from ArcGIS Pro tool interface
-    param0 = arcpy.GetParameterAsText(0) or FEATURE_CLASS   # Input Feature Class
-    param1 = arcpy.GetParameterAsText(1) or FEATURE_ID      # Feature ID Field
-    param2 = arcpy.GetParameterAsText(2) or THEME_REFTAB    # Theme Reference Table
-    param3 = arcpy.GetParameterAsText(3) or GISPUB_LOCATION # CSDL Location
-    param4 = arcpy.GetParameterAsText(4) or OUT_PATH        # Output Path
+    # Get parameters from ArcGIS Pro tool interface; manual parameters fill any left empty
+    defaults = (FEATURE_CLASS,    # Input Feature Class
+                FEATURE_ID,       # Feature ID Field
+                THEME_REFTAB,     # Theme Reference Table
+                GISPUB_LOCATION,  # CSDL Location
+                OUT_PATH)         # Output Path
+    params = []
+    for index, default in enumerate(defaults):
+        value = arcpy.GetParameterAsText(index)
+        if not value:
+            arcpy.AddMessage(f"Parameter {index} not supplied, using manual parameter: {default}")
+            value = default
+        params.append(value)
+    param0, param1, param2, param3, param4 = params
  
     script_tool(param0, param1, param2, param3, param4)
@@ -12,6 +12,16 @@ import arcpy
 from datetime import datetime
 from typing import List, Tuple, Any
 import csv
+import contextlib
+
+try:
+    # shapely 2.0+, optional - indexes works once and intersects every theme against it
+    from shapely import (STRtree as shapely_strtree, from_wkb as shapely_from_wkb,
+                         intersection as shapely_intersection, area as shapely_area,
+                         length as shapely_length, total_bounds as shapely_total_bounds,
+                         relate_pattern as shapely_relate_pattern)
+except ImportError:
+    shapely_strtree = None
 
 #######################################################################################
 #            ADJUST THESE IF RUNNING OUTSIDE OF THE ARCGIS PRO TOOLBOX                #
@@ -24,12 +34,20 @@ GISPUB_PATH     = 'C:\\data'                       # gis_public folder location
 OUT_PATH        = 'C:\\data\\humecheck\\Outputs2'   # Output Path
 SPATIAL_REF     = 7899                             # Set spatial ref to VICGRID2020
 MAX_STRING_LEN  = 50                               # Limit field length for all rptflds
+LOCATION_FIELD  = 'VC_LOCATION'                    # Tags combined works features as in_polygon/in_buffer
+CSV_BATCH_ROWS  = 1000                             # Rows formatted per batched CSV write
+LOG_FLUSH_LINES = 64                               # Performance log lines buffered between flushes
+INDEX_BATCH     = 5000                             # Values features queried against the works index at once
 
 #######################################################################################
 #######################################################################################
 
 class ValuesCheckTool:
     """Main class for performing spatial values checking operations."""
+
+    # Single-pass removal of CSV-breaking characters, and the strings treated as no value
+    CLEAN_TABLE = str.maketrans({"'": None, ",": ";", "\n": "_n"})
+    NULL_STRINGS = frozenset(('null', 'nan', ''))
     
     def __init__(self, input_fc: str, id_field: str, ref_table: str, 
                  gispub_path: str, output_path: str):
@@ -43,18 +61,23 @@ class ValuesCheckTool:
         
         # Initialise dictionaries
         self.buffer_cache = {}  # stores the works layer and any required buffers
-        self.values_cache = {}  # stores the values layers with any specified filter applied
+        self.values_cache = {}  # stores the values layers keyed by (fc name, definition query)
         self.reftab_dict = {}   # stores relevant fields from the geodatabase reference table
         self.output_dict = {}   # stores details of the intersected values to be combined and exported to CSV 
+        self.works_indexes = {} # stores a shapely STRtree of each works/buffer layer, shared by all themes
+        self.describe_cache = {} # stores (geometry type, extent) of each values layer
+        self.spatial_ref = arcpy.SpatialReference(SPATIAL_REF)
+        self.works_extent = None  # (xmin, ymin, xmax, ymax) of the works in SPATIAL_REF, None if unknown
 
         # Set up performance logging
         perf_log_path = os.path.join(self.output_path, f"{self.get_timestamp()}_script_performance.txt")
-        self.perf_log = open(perf_log_path, "w")
+        self.perf_log = open(perf_log_path, "w", buffering=8192)
+        self._log_since_flush = 0
         self.progress = 1
 
         # Set up output CSV
         self.out_csv_path = os.path.join(self.output_path, f"{self.get_timestamp()}_{self.get_basename(self.input_fc)}_ValuesCheck.csv")
-        self.output_csv = open(self.out_csv_path, 'w', newline='', encoding='utf-8')
+        self.output_csv = open(self.out_csv_path, 'w', newline='', encoding='utf-8', buffering=1 << 20)
         self.writer = csv.writer(self.output_csv)
 
         # Setup geoprocessing environment
@@ -96,6 +119,12 @@ class ValuesCheckTool:
         except Exception as e:
             self.logMessage('error', f"Error in main execution: {str(e)}")
             raise
+
+        finally:
+            # write out any buffered log lines and release the files, even if the run failed
+            if not self.output_csv.closed:
+                self.output_csv.close()
+            self.perf_log.close()
     
     def data_to_csv(self) -> None:
         """
@@ -109,38 +138,55 @@ class ValuesCheckTool:
                 
             # create header row
             header = [self.id_field]
-            first_feature = next(iter(output_dict.values()))
-            theme_names = list(first_feature.keys())
+            theme_names = [fc_data["theme_name"] for fc_data in self.reftab_dict.values()]
             for theme in theme_names:
                 header.append(theme)
 
+            # retrieve result keys, method and buffer distance for each theme once, with its all-Nil string
+            theme_to_meta = {fc_data["theme_name"]: fc_data for fc_data in self.reftab_dict.values()}
+            theme_meta = []
+            for theme in theme_names:
+                fc_data = theme_to_meta[theme]
+                method = fc_data["method"]
+                buffer_distance = fc_data["buffer_distance"]
+                geometry_type = fc_data["geometry_type"]
+                nil_string = self._results_to_string([], [], method, buffer_distance, geometry_type)
+                theme_meta.append(((theme, 'in_polygon'), (theme, 'in_buffer'), method, 
+                                   buffer_distance, geometry_type, nil_string))
+
             # write header to output CSV
             self.writer.writerow(header)
             
-            # step through dict, compiling row data
+            # step through dict, compiling row data and writing in batches
+            rows = []
             for feature_id, feature_data in output_dict.items():
                 row_data = [feature_id]
 
-                for theme in theme_names:
+                for polygon_key, buffer_key, method, buffer_distance, geometry_type, nil_string in theme_meta:
+                    polygon_results = feature_data.get(polygon_key)
+                    buffer_results = feature_data.get(buffer_key)
 
-                    # retrieve method and buffer distance for current theme from reftab
-                    for fc_name, fc_data in self.reftab_dict.items():
-                        if fc_data["theme_name"] == theme:
-                            method = fc_data["method"]
-                            buffer_distance = fc_data["buffer_distance"]
-                            geometry_type = fc_data["geometry_type"]
+                    # nothing found for this theme - reuse the pre-built string
+                    if not polygon_results and not buffer_results:
+                        row_data.append(nil_string)
+                        continue
 
                     # get list data for polygon and buffer
-                    polygon_data = feature_data[theme]['in_polygon']
-                    buffer_data = feature_data[theme]['in_buffer']
+                    polygon_data = self._results_to_list(polygon_results or {}, method)
+                    buffer_data = self._results_to_list(buffer_results or {}, method)
 
                     # convert lists to single string
                     value_string = self._results_to_string(polygon_data, buffer_data, method, buffer_distance, geometry_type)
                     row_data.append(value_string)
                 
-                # write row to output CSV
-                self.writer.writerow(row_data)
+                rows.append(row_data)
+
+                # write batch to output CSV
+                if len(rows) >= CSV_BATCH_ROWS:
+                    self.writer.writerows(rows)
+                    rows.clear()
 
+            self.writer.writerows(rows)
             self.output_csv.close()
             self.logMessage('info', f" - - - - -") 
             self.logMessage('info', f"Results written to CSV: {self.out_csv_path}") 
@@ -148,6 +194,13 @@ class ValuesCheckTool:
         except Exception as e:
             self.logMessage('error', f"Error while creating CSV file: {str(e)}") 
 
+    @staticmethod
+    def _results_to_list(results: dict, method: str) -> List[list]:
+        """Flatten a results dictionary to lists of values, with count/measure last except for PRESENT."""
+        if method.upper() == "PRESENT":
+            return [list(key) for key in results]
+        return [list(key) + [total] for key, total in results.items()]
+
     def _results_to_string(self, list_poly: list, list_buff: list, method: str, buffer_distance: int, geometry_type: str) -> List:
         """
         Format intersection results into readable strings based on analysis method.
@@ -259,6 +312,12 @@ class ValuesCheckTool:
                     rpt_fields.append(field)
             query = fc_dict["definition_query"]
 
+            # Skip the theme if its extent is nowhere near the works - results stay "Nil features"
+            if not self.extents_overlap(self.works_extent, fc_dict["extent"], buffer_dist or 0):
+                self.logMessage('info', f"{self.progress}/{len(self.reftab_dict)} Skipped {fc_name}, outside the extent of the works")
+                self.progress += 1
+                return
+
             # Get the base works feature class (unbuffered)
             works_base_name = self.get_basename(self.input_fc)
             works_fc = self.buffer_cache.get(works_base_name)
@@ -268,6 +327,13 @@ class ValuesCheckTool:
                 self.logMessage('error', f"Could not find base works feature class in cache: {works_base_name}")
                 return
 
+            # Works and buffer combined into one layer - intersect both locations at once
+            combined_fc = self.buffer_cache.get(f"{works_base_name}_{buffer_dist}_combined")
+            if buffer_dist is not None and buffer_dist > 0 and combined_fc is not None:
+                self._process_spatial_intersection(combined_fc, values_fc, fc_name, None, rpt_fields)
+                self.progress += 1
+                return
+
             # Process direct intersections (polygon to polygon/point/line)
             self._process_spatial_intersection(works_fc, values_fc, fc_name, "in_polygon", rpt_fields)
 
@@ -295,56 +361,77 @@ class ValuesCheckTool:
                                 location_type: str, rpt_fields: List[str]) -> None:
         """
         Perform spatial intersection analysis between one works feature and one values feature.
-        Uses ArcPy Intersect tool and populates output dictionary based on analysis method.
-        Handles geometry-specific calculations for COUNT and MEASURE methods
+        Uses the shapely works index where available, otherwise ArcPy Pairwise Intersect,
+        and populates output dictionary based on analysis method.
+        Handles geometry-specific calculations for COUNT and MEASURE methods.
+        A location_type of None reads the location from LOCATION_FIELD of combined works.
         """
         
         try:
-            # retrieve parameters from the output dictionary
-            theme_name = self.reftab_dict[fc_name]["theme_name"]
-            method = self.reftab_dict[fc_name]["method"]
-            buffer_distance = self.reftab_dict[fc_name]["buffer_distance"]
-            query = self.reftab_dict[fc_name]["definition_query"]
-            
-            # clear any existing selection on values layer and apply definition query if provided
-            arcpy.management.SelectLayerByAttribute(values_fc, "CLEAR_SELECTION")
-            if query and query != "":
-                arcpy.management.SelectLayerByAttribute(values_fc, "NEW_SELECTION", query)
-
-            # Check what sort of geometry we're looking at
-            desc = arcpy.Describe(values_fc)
-            geometry_type = desc.shapeType.upper()
+            # retrieve parameters from the reference table dictionary
+            fc_dict = self.reftab_dict[fc_name]
+            theme_name = fc_dict["theme_name"]
+            method = fc_dict["method"]
+            method_upper = method.upper()
+            buffer_distance = fc_dict["buffer_distance"]
+
+            # Check what sort of geometry we're looking at (described once in load_values_fcs)
+            geometry_type = fc_dict["geometry_type"]
+            is_polygon = geometry_type == "POLYGON"
+            is_polyline = geometry_type == "POLYLINE"
+            clean_table = self.CLEAN_TABLE
+            null_strings = self.NULL_STRINGS
+            output_dict = self.output_dict
+            result_keys = {location: (theme_name, location) for location in ("in_polygon", "in_buffer")}
             
             # make string for message logging
             if location_type == "in_polygon":
                 msg_string = f"between {fc_name} and works polygons ({method})"
-            else:
+            elif location_type == "in_buffer":
                 msg_string = f"between {fc_name} and {buffer_distance}m works buffer ({method})"
+            else:
+                msg_string = f"between {fc_name} and works polygons with {buffer_distance}m buffer ({method})"
 
-            # add works feature identifier and shape to report fields
-            out_fields = ["SHAPE@", FEATURE_ID] + rpt_fields
+            # add works feature identifier, shape and (for combined works) location to report fields
+            if location_type is None:
+                out_fields = ["SHAPE@", FEATURE_ID, LOCATION_FIELD] + rpt_fields
+            else:
+                out_fields = ["SHAPE@", FEATURE_ID] + rpt_fields
+            first_value = len(out_fields) - len(rpt_fields)
 
             # temporary feature class name
             joined_fc = f"in_memory\\temporary_joined_data"
             
-            # Use one-to-many join so we can process all works at once
-            arcpy.analysis.Intersect([works_fc, values_fc], joined_fc)
-            intersected_count = int(arcpy.management.GetCount(joined_fc)[0])
+            # Query the works index if there is one, otherwise one-to-many join so we can process all works at once
+            works_index = self.get_works_index(works_fc, location_type is None)
+            if works_index is not None:
+                index_rows = self._index_intersections(works_index, values_fc, rpt_fields, geometry_type, 
+                                                       location_type is None, method_upper == "MEASURE")
+                intersected_count = len(index_rows)
+            else:
+                index_rows = None
+                arcpy.analysis.PairwiseIntersect([works_fc, values_fc], joined_fc, join_attributes="ALL")
+                intersected_count = int(arcpy.management.GetCount(joined_fc)[0])
             if intersected_count == 0:
                 self.logMessage('info', f"{self.progress}/{len(self.reftab_dict)} No intersections found {msg_string}")
                 return
 
             # Step through each row in the join and add to output dictionary if it doesn't already exist
-            with arcpy.da.SearchCursor(joined_fc, out_fields) as cursor:
+            if index_rows is None:
+                rows = arcpy.da.SearchCursor(joined_fc, out_fields)
+            else:
+                rows = contextlib.nullcontext(index_rows)  # same layout as the cursor, measure in place of shape
+            with rows as cursor:
                 for row in cursor:
                     shape = row[0]
                     works_feature_id = row[1]
+                    row_location = row[2] if location_type is None else location_type
 
                     # process individual reporting fields identified in reference table
                     field_values = []
 
                     # some clean up - this needs to be thorough to ensure later robustness
-                    for field_value in row[2:]:  # Skip index 0 and 1 (shape & id)
+                    for field_value in row[first_value:]:  # Skip shape, id and location
                         
                         if isinstance(field_value, datetime):
                             # if date & time, convert to simplified date string
@@ -354,60 +441,41 @@ class ValuesCheckTool:
                             str_val = str(field_value).strip()
 
                         # remove any CSV-breaking elements
-                        str_val = str(str_val).replace("'", "").replace(",", ";").replace("\n", "_n")
+                        str_val = str_val.translate(clean_table)
                         
                         # skip if empty or any variety of no-value EXCEPT "None" which is required for... reasons
-                        if str_val and str_val.lower() not in ['null', 'nan', '']:
+                        if str_val and str_val.lower() not in null_strings:
                             # restrict string length to whatever is defined in MAX_STRING_LEN
                             if len(str_val) > MAX_STRING_LEN:
                                 field_values.append(f"{str_val[:MAX_STRING_LEN-3]}...")
                             else:
                                 field_values.append(str_val)
                         
-                    # add reporting fields (plus count/measure if req.) to output dictionary, as a LIST                    
-                    if method.upper() == "PRESENT":
+                    # add reporting fields (plus count/measure if req.) to output dictionary, keyed by TUPLE
+                    results = output_dict[works_feature_id].setdefault(result_keys[row_location], {})
+                    key = tuple(field_values)
+                    if method_upper == "PRESENT":
                         # if matching item doesn't exist, add to output dictionary
-                        if field_values not in self.output_dict[works_feature_id][theme_name][location_type]:
-                            self.output_dict[works_feature_id][theme_name][location_type].append(field_values)
+                        results.setdefault(key, None)
                     
-                    elif method.upper() == "COUNT":
-                        found = False
-                        # if matching item already exists, increment its count field
-                        for existing_entry in self.output_dict[works_feature_id][theme_name][location_type]:
-                            # compare everything except the last element (which is the count)
-                            if existing_entry[:-1] == field_values: # Found a match - increment the count
-                                existing_entry[-1] += 1
-                                found = True
-                                break
-
-                        # if matching item doesn't exist, add to output dictionary with a count of 1
-                        if not found:
-                            field_values.append(1)  # Add count as last element
-                            self.output_dict[works_feature_id][theme_name][location_type].append(field_values)
-
-                    elif method.upper() == "MEASURE":
+                    elif method_upper == "COUNT":
+                        # increment count of matching item, starting from 0 if new
+                        results[key] = results.get(key, 0) + 1
+
+                    elif method_upper == "MEASURE":
                         # determine how to calculate the measure field (area or length)
-                        if geometry_type == "POLYGON":
+                        if index_rows is not None:
+                            measure = shape  # already in hectares/kilometres, see _index_intersections
+                        elif is_polygon:
                             measure = shape.area/10000  # Area in hectares
-                        elif geometry_type == "POLYLINE":
+                        elif is_polyline:
                             measure = shape.length/1000   # Length in kilometers
 
-                        # if matching item already exists, add to its measure field
-                        found = False
-                        for existing_entry in self.output_dict[works_feature_id][theme_name][location_type]:
-                            # compare everything except the last element (which is the measure)
-                            if existing_entry[:-1] == field_values: # Found a match - increment the measure
-                                existing_entry[-1] += measure
-                                found = True
-                                break
-                        
-                        # if matching item doesn't exist, add to output dictionary and populate measure field
-                        if not found:
-                            field_values.append(measure)  # Add measure as last element
-                            self.output_dict[works_feature_id][theme_name][location_type].append(field_values)
+                        # add to measure of matching item, starting from 0 if new
+                        results[key] = results.get(key, 0) + measure
 
                 # Clean up temporary feature class
-                if arcpy.Exists(joined_fc):
+                if index_rows is None and arcpy.Exists(joined_fc):
                     arcpy.Delete_management(joined_fc)
             
             self.logMessage('info', f"{self.progress}/{len(self.reftab_dict)} Processed {intersected_count} intersections {msg_string}")
@@ -415,32 +483,110 @@ class ValuesCheckTool:
         except Exception as e:
             self.logMessage('error', f"Error in spatial intersection processing: {str(e)}")
 
+    def get_works_index(self, works_fc: str, with_location: bool) -> Any:
+        """
+        Return (STRtree, geometries, feature ids, locations, extent) for a polygon works layer,
+        built on first use and shared by every theme. Returns None without shapely 2.
+        """
+        if shapely_strtree is None:
+            return None
+
+        if works_fc not in self.works_indexes:
+            works_index = None
+
+            # only polygons - Intersect output would otherwise drop to the works' lower dimension
+            if arcpy.Describe(works_fc).shapeType.upper() == "POLYGON":
+                fields = ["SHAPE@WKB", FEATURE_ID] + ([LOCATION_FIELD] if with_location else [])
+                wkbs, ids, locations = [], [], []
+                with arcpy.da.SearchCursor(works_fc, fields, spatial_reference=self.spatial_ref) as cursor:
+                    for row in cursor:
+                        if row[0] is not None:
+                            wkbs.append(bytes(row[0]))
+                            ids.append(row[1])
+                            locations.append(row[2] if with_location else None)
+
+                if wkbs:
+                    geoms = shapely_from_wkb(wkbs)
+                    xmin, ymin, xmax, ymax = shapely_total_bounds(geoms)
+                    extent = arcpy.Polygon(arcpy.Array([arcpy.Point(xmin, ymin), arcpy.Point(xmin, ymax),
+                                                        arcpy.Point(xmax, ymax), arcpy.Point(xmax, ymin)]), self.spatial_ref)
+                    works_index = (shapely_strtree(geoms), geoms, ids, locations, extent)
+                    self.logMessage('info', f"Indexed {len(ids)} works features in {works_fc}")
+
+            self.works_indexes[works_fc] = works_index
+
+        return self.works_indexes[works_fc]
+
+    def _index_intersections(self, works_index: Tuple, values_fc: str, rpt_fields: List[str], 
+                             geometry_type: str, with_location: bool, with_measure: bool) -> List[tuple]:
+        """
+        Intersect a values layer with an indexed works layer, returning rows laid out as
+        the Intersect cursor would: (measure, works id[, location], reporting fields...).
+        The measure is hectares for polygons, kilometres for lines and None for points, or
+        when with_measure is False. Pairs that only touch are dropped for line and polygon
+        values, as Intersect does.
+        """
+        tree, works_geoms, ids, locations, extent = works_index
+        rows = []
+
+        def add_batch(batch):
+            values_geoms = shapely_from_wkb([row[0] for row in batch])
+            values_pos, works_pos = tree.query(values_geoms, predicate="intersects")
+
+            # PRESENT/COUNT only need to know a pair overlaps - skip building the pieces where possible
+            if not with_measure and geometry_type != "POLYLINE":
+                if geometry_type == "POLYGON":
+                    # interiors meet, i.e. more than a shared edge
+                    overlaps = shapely_relate_pattern(values_geoms[values_pos], works_geoms[works_pos], "T********")
+                    values_pos, works_pos = values_pos[overlaps], works_pos[overlaps]
+                for v, w in zip(values_pos.tolist(), works_pos.tolist()):
+                    location = (locations[w],) if with_location else ()
+                    rows.append((None, ids[w]) + location + batch[v][1:])
+                return
+
+            shapes = shapely_intersection(values_geoms[values_pos], works_geoms[works_pos])
+
+            # measure every piece in one vectorised call
+            if geometry_type == "POLYGON":
+                measures = (shapely_area(shapes) / 10000).tolist()  # Area in hectares
+            elif geometry_type == "POLYLINE":
+                measures = (shapely_length(shapes) / 1000).tolist()  # Length in kilometers
+            else:
+                measures = [None] * len(shapes)
+
+            for v, w, measure in zip(values_pos.tolist(), works_pos.tolist(), measures):
+                if measure is None or measure > 0:
+                    location = (locations[w],) if with_location else ()
+                    rows.append((measure, ids[w]) + location + batch[v][1:])
+
+        # only read values features within the extent of the works
+        batch = []
+        with arcpy.da.SearchCursor(values_fc, ["SHAPE@WKB"] + rpt_fields, 
+                                   spatial_reference=self.spatial_ref, spatial_filter=extent) as cursor:
+            for row in cursor:
+                if row[0] is not None:
+                    batch.append((bytes(row[0]),) + row[1:])
+                    if len(batch) >= INDEX_BATCH:
+                        add_batch(batch)
+                        batch = []
+        if batch:
+            add_batch(batch)
+
+        return rows
+
     def create_output_dict(self, works_fc: str, values_dict: str) -> None:
         """
-        Initialise the output dictionary structure for all works features and themes.
-        Creates nested dictionary with feature IDs, theme names, and separate storage
-        for polygon and buffer intersection results.
+        Initialise the output dictionary with an empty entry for every works feature.
+        Storage for each (theme name, location) is only added when an intersection is
+        found, so features x themes of empty results are never allocated.
         """
         
         try:
-            # make a list of required column names - these will be headers for csv
-            column_names = []
-            for fc_name in self.reftab_dict:
-                column_names.append(self.reftab_dict[fc_name]["theme_name"])
-
-            # add all works feature ids
+            # add all works feature ids - results are keyed (theme_name, "in_polygon"/"in_buffer"),
+            # each a dict of values tuple: count/measure (None for PRESENT)
             with arcpy.da.SearchCursor(works_fc, FEATURE_ID) as cursor:
                 for row in cursor:
-                    feature = row[0]
-                    self.output_dict[feature] = {}
-                    
-                    # populate column names
-                    for column_name in column_names:
-                        self.output_dict[feature][column_name] = {}
-
-                        #add storage for results inside polygon and inside buffer - note the values storage is a [list] not dict 
-                        for location in ["in_polygon", "in_buffer"]:
-                            self.output_dict[feature][column_name][location] = []
+                    self.output_dict[row[0]] = {}
 
             self.logMessage('info', f"Created empty output dictionary")
 
@@ -468,6 +614,7 @@ class ValuesCheckTool:
 
             # have a look at the feature class (describe)
             desc = arcpy.Describe(feature_class)
+            self.works_extent = self.get_extent(desc)
 
             # Copy base features (unbuffered) unless it already exists in cache
             name = desc.baseName
@@ -477,6 +624,7 @@ class ValuesCheckTool:
                 self.buffer_cache[name] = layer_name
 
             # Create buffered features if requested, unless it already exists in cache
+            base_fc = None  # in-memory copy of the works tagged in_polygon, made with the first buffer
             for distance in buffer_distances:
                 buffer_name = f"{desc.baseName}_{distance}"
 
@@ -493,21 +641,49 @@ class ValuesCheckTool:
                     buffer_fc = f"in_memory\\{buffer_name}_{unique_suffix}"
                     layer_name = f"{buffer_name}_layer_{unique_suffix}"
                     
-                    arcpy.analysis.Buffer(
-                            in_features=feature_class,
-                            out_feature_class=buffer_fc,
-                            buffer_distance_or_field=f"{distance} meters",
-                            line_side=side,
-                            line_end_type="ROUND",
-                            dissolve_option="NONE",
-                            dissolve_field=None,
-                            method="PLANAR"
-                        )
+                    if side == "FULL":
+                        # Pairwise Buffer runs in parallel, but has no outside-only option
+                        arcpy.analysis.PairwiseBuffer(
+                                in_features=feature_class,
+                                out_feature_class=buffer_fc,
+                                buffer_distance_or_field=f"{distance} meters",
+                                dissolve_option="NONE",
+                                method="PLANAR"
+                            )
+                    else:
+                        arcpy.analysis.Buffer(
+                                in_features=feature_class,
+                                out_feature_class=buffer_fc,
+                                buffer_distance_or_field=f"{distance} meters",
+                                line_side=side,
+                                line_end_type="ROUND",
+                                dissolve_option="NONE",
+                                dissolve_field=None,
+                                method="PLANAR"
+                            )
 
                     # Create layer from buffer
                     arcpy.management.MakeFeatureLayer(buffer_fc, layer_name)
                     self.buffer_cache[buffer_name] = layer_name
 
+                    # Combine polygon works and their outside-only buffer, tagged by location, so each
+                    # theme needs one Intersect (Merge can't mix line/point works with polygon buffers)
+                    if geometry_type == "POLYGON":
+                        try:
+                            if base_fc is None:
+                                base_fc = f"in_memory\\{name}_base_{unique_suffix}"
+                                arcpy.management.CopyFeatures(feature_class, base_fc)
+                                arcpy.management.CalculateField(base_fc, LOCATION_FIELD, "'in_polygon'", "PYTHON3", field_type="TEXT")
+                            combined_fc = f"in_memory\\{buffer_name}_combined_{unique_suffix}"
+                            arcpy.management.Merge([base_fc, buffer_fc], combined_fc)
+                            # tag the merged buffer rows, leaving the buffer layer itself untouched
+                            arcpy.management.CalculateField(combined_fc, LOCATION_FIELD, 
+                                                            f"!{LOCATION_FIELD}! or 'in_buffer'", "PYTHON3")
+                            arcpy.management.MakeFeatureLayer(combined_fc, f"{buffer_name}_combined_layer_{unique_suffix}")
+                            self.buffer_cache[f"{buffer_name}_combined"] = f"{buffer_name}_combined_layer_{unique_suffix}"
+                        except Exception as e:
+                            self.logMessage('warn', f"Could not combine works with {distance}m buffer, intersecting separately: {str(e)}")
+
             self.logMessage('info', f"Cached {feature_class} and {len(buffer_distances)} buffers")
 
         except Exception as e:
@@ -549,28 +725,33 @@ class ValuesCheckTool:
 
                     # Check if the feature class exists before trying to use it
                     if not arcpy.Exists(values_fc_path):
-                        self.logMessage('warning', f"Feature class not found: {values_fc_path}")
+                        self.logMessage('warn', f"Feature class not found: {values_fc_path}")
                         continue
                     
-                    # Cache values layer with unique name
-                    if fc_name not in self.values_cache:
+                    # Remove " " values from definition queries
+                    clean_query = None if not query or not query.strip() else query
+
+                    # Cache values layer with unique name, with the definition query applied once here
+                    cache_key = (fc_name, clean_query)
+                    if cache_key not in self.values_cache:
                         layer_name = f"{fc_name}_{row_oid}"
-                        arcpy.management.MakeFeatureLayer(values_fc_path, layer_name)
-                        self.values_cache[fc_name] = layer_name
+                        arcpy.management.MakeFeatureLayer(values_fc_path, layer_name, where_clause=clean_query)
+                        self.values_cache[cache_key] = layer_name
                         # self.logMessage('info', f"Cached {fc_name}")
+                    layer_name = self.values_cache[cache_key]
 
-                    # determine geometry type
-                    desc = arcpy.Describe(layer_name)
-                    geometry_type = desc.shapeType.upper()
-
-                    # Remove " " values from definition queries
-                    clean_query = None if not query or not query.strip() else query
+                    # determine geometry type, describing each layer only once
+                    if layer_name not in self.describe_cache:
+                        desc = arcpy.Describe(layer_name)
+                        self.describe_cache[layer_name] = (desc.shapeType.upper(), self.get_extent(desc))
+                    geometry_type, extent = self.describe_cache[layer_name]
 
                     # Populate reference table dictionary
                     self.reftab_dict[theme_name] = {
                         "theme_name": theme_name,
                         "cached_fc": layer_name,
                         "geometry_type": geometry_type,
+                        "extent": extent,
                         "method": method,
                         "definition_query": clean_query,
                         "buffer_distance": buffer_distance,
@@ -591,6 +772,24 @@ class ValuesCheckTool:
         """Return formatted timestamp string."""
         return datetime.now().strftime("%Y%m%d_%H%Mhr")
     
+    def get_extent(self, desc: Any) -> Tuple[float, float, float, float]:
+        """Return a described dataset's extent as (xmin, ymin, xmax, ymax) in SPATIAL_REF, or None if unknown."""
+        try:
+            extent = desc.extent.projectAs(self.spatial_ref)
+            return (extent.XMin, extent.YMin, extent.XMax, extent.YMax)
+        except Exception:
+            return None
+
+    @staticmethod
+    def extents_overlap(works_extent: Tuple, values_extent: Tuple, buffer_distance: float) -> bool:
+        """Check whether the works extent, grown by the buffer distance, overlaps the values extent."""
+        if works_extent is None or values_extent is None:
+            return True  # can't tell, so intersect anyway
+        return not (works_extent[0] - buffer_distance > values_extent[2] or 
+                    works_extent[2] + buffer_distance < values_extent[0] or 
+                    works_extent[1] - buffer_distance > values_extent[3] or 
+                    works_extent[3] + buffer_distance < values_extent[1])
+
     @staticmethod
     def get_basename(filepath: str) -> str:
         """Extract basename from file path without extension."""
@@ -600,7 +799,12 @@ class ValuesCheckTool:
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         try:
             self.perf_log.write(f"{now} {message}\n")
-            self.perf_log.flush()
+            
+            # flush every LOG_FLUSH_LINES lines, or straight away for errors and warnings
+            self._log_since_flush += 1
+            if self._log_since_flush >= LOG_FLUSH_LINES or type in ("error", "warn"):
+                self.perf_log.flush()
+                self._log_since_flush = 0
         except Exception as e:
             # Fallback if file writing fails
             print(f"Log write error: {e}")